@@ -0,0 +1,8 @@
+# gunicorn 설정 - I/O 대기가 대부분인 API이므로 여러 워커 프로세스 + 워커당 스레드로 동시 요청 처리
+# (GUNICORN_CMD_ARGS 환경 변수가 이 파일의 값보다 우선 적용됨)
+bind = "0.0.0.0:5000"
+worker_class = "gthread"
+workers = 4
+threads = 32
+# 분석용 데모 엔드포인트가 기본값(30초)보다 오래 걸릴 수 있음
+timeout = 120
@@ -0,0 +1,83 @@
+"""
+DB 연결 없이 동작하는 쿼리 헬퍼
+- EXTRACT(YEAR/MONTH FROM col) = N 조건을 날짜 범위 조건으로 재작성 (/db-tuning/query-plan ?rewrite=1)
+- COPY ... (FORMAT BINARY) 출력의 행 수 계산 (/db-tuning/scan-comparison)
+"""
+
+import struct
+from datetime import MAXYEAR, MINYEAR, date
+
+import sqlglot
+from sqlglot import exp
+
+def _extract_predicate(node):
+    """EXTRACT(YEAR|MONTH FROM 컬럼) = 정수 조건이면 (단위, 컬럼, 값), 아니면 None"""
+    if not isinstance(node, exp.EQ):
+        return None
+    for extract, literal in ((node.this, node.expression), (node.expression, node.this)):
+        if (isinstance(extract, exp.Extract) and isinstance(extract.expression, exp.Column)
+                and isinstance(literal, exp.Literal) and not literal.is_string):
+            unit = extract.this.name.upper()
+            if unit in ('YEAR', 'MONTH') and literal.this.isdigit():
+                value = int(literal.this)
+                # 범위 끝(다음 해 1월 1일)도 date로 표현할 수 있는 연도만 바꿈
+                if unit == 'MONTH' or MINYEAR <= value < MAXYEAR:
+                    return unit, extract.expression, value
+    return None
+
+def _date_range(column, start, end):
+    return exp.and_(
+        exp.GTE(this=column.copy(), expression=exp.Literal.string(start.isoformat())),
+        exp.LT(this=column.copy(), expression=exp.Literal.string(end.isoformat()))
+    )
+
+def rewrite_extract_predicates(query):
+    """WHERE 절의 EXTRACT(YEAR/MONTH FROM col) = N 조건을 col 범위 조건으로 바꿈 (인덱스 범위 스캔 가능)
+
+    - YEAR만 있으면 [N-01-01, N+1-01-01)
+    - 같은 AND 조건에 YEAR와 MONTH가 함께 있으면 [Y-M-01, 다음 달 1일)
+    - YEAR 없는 MONTH 조건은 하나의 범위로 바꿀 수 없으므로 그대로 둠
+    """
+    tree = sqlglot.parse_one(query, read='postgres')
+    for where in tree.find_all(exp.Where):
+        conjuncts = list(where.this.flatten()) if isinstance(where.this, exp.And) else [where.this]
+        years, months = {}, {}
+        for node in conjuncts:
+            predicate = _extract_predicate(node)
+            if predicate:
+                unit, column, value = predicate
+                (years if unit == 'YEAR' else months)[column.sql()] = (node, column, value)
+        if not years:
+            continue
+
+        replaced = {}
+        for key, (node, column, year) in years.items():
+            month_node, _, month = months.get(key, (None, None, None))
+            if month_node is not None and 1 <= month <= 12:
+                start = date(year, month, 1)
+                end = date(year + month // 12, month % 12 + 1, 1)
+                replaced[id(month_node)] = None
+            else:
+                start, end = date(year, 1, 1), date(year + 1, 1, 1)
+            replaced[id(node)] = _date_range(column, start, end)
+
+        conditions = [replaced.get(id(node), node) for node in conjuncts]
+        where.set('this', exp.and_(*[c for c in conditions if c is not None]))
+    return tree.sql(dialect='postgres')
+
+
+def count_rows_in_binary(data):
+    """COPY ... (FORMAT BINARY) 출력의 튜플 수 - 값은 디코딩하지 않고 필드 길이만 따라가며 건너뜀"""
+    view = memoryview(data)
+    # 헤더: 시그니처(11) + 플래그(4) + 헤더 확장 길이(4) + 확장 영역
+    offset = 19 + struct.unpack_from('!i', view, 15)[0]
+    row_count = 0
+    while True:
+        (field_count,) = struct.unpack_from('!h', view, offset)
+        offset += 2
+        if field_count == -1:  # 트레일러
+            return row_count
+        for _ in range(field_count):
+            (length,) = struct.unpack_from('!i', view, offset)
+            offset += 4 + max(length, 0)  # NULL은 길이 -1
+        row_count += 1
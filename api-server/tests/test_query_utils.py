@@ -0,0 +1,90 @@
+import struct
+import unittest
+
+from query_utils import count_rows_in_binary, rewrite_extract_predicates
+
+COPY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+
+
+def copy_binary(rows, header_extension=b''):
+    """rows(필드 값 bytes 또는 NULL은 None의 튜플 목록)를 COPY BINARY 형식으로 직렬화"""
+    data = COPY_SIGNATURE + struct.pack('!ii', 0, len(header_extension)) + header_extension
+    for row in rows:
+        data += struct.pack('!h', len(row))
+        for value in row:
+            if value is None:
+                data += struct.pack('!i', -1)
+            else:
+                data += struct.pack('!i', len(value)) + value
+    return data + struct.pack('!h', -1)
+
+
+class RewriteExtractPredicatesTest(unittest.TestCase):
+    def test_year_becomes_range(self):
+        sql = rewrite_extract_predicates(
+            "SELECT * FROM orders WHERE EXTRACT(YEAR FROM order_date) = 2023"
+        )
+        self.assertIn("order_date >= '2023-01-01'", sql)
+        self.assertIn("order_date < '2024-01-01'", sql)
+        self.assertNotIn("EXTRACT", sql)
+
+    def test_year_and_month_become_month_range(self):
+        sql = rewrite_extract_predicates(
+            "SELECT * FROM orders WHERE EXTRACT(YEAR FROM order_date) = 2023 "
+            "AND EXTRACT(MONTH FROM order_date) = 6 AND status = 'shipped'"
+        )
+        self.assertIn("order_date >= '2023-06-01'", sql)
+        self.assertIn("order_date < '2023-07-01'", sql)
+        self.assertIn("status = 'shipped'", sql)
+        self.assertNotIn("EXTRACT", sql)
+
+    def test_december_rolls_over_to_next_year(self):
+        sql = rewrite_extract_predicates(
+            "SELECT * FROM orders WHERE EXTRACT(MONTH FROM order_date) = 12 "
+            "AND EXTRACT(YEAR FROM order_date) = 2023"
+        )
+        self.assertIn("order_date >= '2023-12-01'", sql)
+        self.assertIn("order_date < '2024-01-01'", sql)
+
+    def test_month_without_year_is_kept(self):
+        sql = rewrite_extract_predicates(
+            "SELECT * FROM orders WHERE EXTRACT(MONTH FROM order_date) = 6"
+        )
+        self.assertIn("EXTRACT(MONTH FROM order_date) = 6", sql)
+
+    def test_or_condition_is_kept(self):
+        sql = rewrite_extract_predicates(
+            "SELECT * FROM orders WHERE EXTRACT(YEAR FROM order_date) = 2023 OR status = 'pending'"
+        )
+        self.assertIn("EXTRACT(YEAR FROM order_date) = 2023", sql)
+
+    def test_out_of_range_year_is_kept(self):
+        for year in (0, 9999):
+            sql = rewrite_extract_predicates(
+                f"SELECT * FROM orders WHERE EXTRACT(YEAR FROM order_date) = {year}"
+            )
+            self.assertIn(f"EXTRACT(YEAR FROM order_date) = {year}", sql)
+
+
+class CountRowsInBinaryTest(unittest.TestCase):
+    def test_empty_result(self):
+        self.assertEqual(count_rows_in_binary(copy_binary([])), 0)
+
+    def test_counts_rows_with_nulls(self):
+        rows = [
+            (struct.pack('!i', 1), b'shipped'),
+            (struct.pack('!i', 2), None),
+            (struct.pack('!i', 3), b''),
+        ]
+        self.assertEqual(count_rows_in_binary(copy_binary(rows)), 3)
+
+    def test_skips_header_extension(self):
+        data = copy_binary([(b'abc',)], header_extension=b'\x00' * 8)
+        self.assertEqual(count_rows_in_binary(data), 1)
+
+    def test_accepts_memoryview(self):
+        self.assertEqual(count_rows_in_binary(memoryview(copy_binary([(b'x',), (b'y',)]))), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
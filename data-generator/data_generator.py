@@ -128,6 +128,15 @@ class EcommerceDataGenerator:
                 except Exception as e:
                     logger.warning(f"Failed to index product {product['product_id']}: {e}")
 
+                # Redis에 상품 메타데이터 저장 (API 서버가 ES 조회 없이 사용, 필드 값은 JSON 인코딩)
+                try:
+                    self.redis_client.hset(
+                        f"products:meta:{product['product_id']}",
+                        mapping={field: json.dumps(value) for field, value in product.items()}
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to cache product {product['product_id']} metadata: {e}")
+
         logger.info(f"Generated and stored {len(self.products)} products")
 
     def generate_users(self, num_users=5000):
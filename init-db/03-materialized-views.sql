@@ -0,0 +1,180 @@
+-- 분석 API용 Materialized View
+-- 매 요청마다 수개월치 주문을 조인/집계하지 않도록 결과를 미리 계산해 둠
+-- api-server가 주기적으로 REFRESH MATERIALIZED VIEW CONCURRENTLY 실행 (MV_REFRESH_INTERVAL)
+-- CONCURRENTLY 갱신에는 UNIQUE 인덱스가 필요
+-- 기존 볼륨에는 api-server가 시작 시 이 파일을 다시 실행해 생성하므로 IF NOT EXISTS로 작성
+
+-- /analytics/complex-order-analysis: 최근 12개월 월별/카테고리별 주문 통계
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_monthly_category_stats AS
+SELECT
+    DATE_TRUNC('month', o.created_at) as month,
+    c.name as category,
+    COUNT(DISTINCT o.order_id) as order_count,
+    COUNT(DISTINCT o.user_id) as unique_customers,
+    SUM(oi.quantity * oi.unit_price) as revenue,
+    AVG(oi.quantity * oi.unit_price) as avg_order_value,
+    MIN(oi.quantity * oi.unit_price) as min_order_value,
+    MAX(oi.quantity * oi.unit_price) as max_order_value,
+    STDDEV(oi.quantity * oi.unit_price) as revenue_stddev
+FROM orders o
+JOIN order_items oi ON o.order_id = oi.order_id
+JOIN products p ON oi.product_id = p.product_id
+JOIN categories c ON p.category_id = c.category_id
+WHERE o.created_at >= CURRENT_DATE - INTERVAL '12 months'
+GROUP BY DATE_TRUNC('month', o.created_at), c.name;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_monthly_category_stats ON mv_monthly_category_stats(month, category);
+
+-- /analytics/heavy-aggregation: 최근 6개월 상품별 판매 통계
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_product_heavy_agg AS
+SELECT
+    p.product_id,
+    p.name as product_name,
+    c.name as category,
+    b.name as brand,
+    COUNT(DISTINCT o.order_id) as total_orders,
+    SUM(oi.quantity) as total_quantity_sold,
+    SUM(oi.quantity * oi.unit_price) as total_revenue,
+    AVG(oi.quantity * oi.unit_price) as avg_order_item_value,
+    MIN(o.created_at) as first_order_date,
+    MAX(o.created_at) as last_order_date,
+    COUNT(DISTINCT o.user_id) as unique_customers,
+    COUNT(DISTINCT DATE_TRUNC('month', o.created_at)) as months_active,
+    COALESCE(AVG(pr.rating), 0) as avg_product_rating,
+    COUNT(pr.review_id) as review_count,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY oi.quantity * oi.unit_price) as median_order_value,
+    PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY oi.quantity * oi.unit_price) as p95_order_value
+FROM products p
+JOIN categories c ON p.category_id = c.category_id
+JOIN brands b ON p.brand_id = b.brand_id
+LEFT JOIN order_items oi ON p.product_id = oi.product_id
+LEFT JOIN orders o ON oi.order_id = o.order_id
+LEFT JOIN product_reviews pr ON p.product_id = pr.product_id
+WHERE o.created_at >= CURRENT_DATE - INTERVAL '6 months'
+GROUP BY p.product_id, p.name, c.name, b.name
+HAVING COUNT(DISTINCT o.order_id) > 0;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_product_heavy_agg ON mv_product_heavy_agg(product_id);
+CREATE INDEX IF NOT EXISTS idx_mv_product_heavy_agg_revenue ON mv_product_heavy_agg(total_revenue DESC NULLS LAST, total_orders DESC);
+
+
+-- /analytics/dashboard: 카테고리 성과 (최근 90일), 일별 추이 (최근 30일), 상품별 판매 (최근 30일)
+-- 대시보드용은 DASHBOARD_MV_REFRESH_INTERVAL(기본 10분)마다 갱신
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_dashboard_category_performance AS
+SELECT
+    c.category_id,
+    c.name as category,
+    COUNT(oi.order_item_id) as items_sold,
+    SUM(oi.total_price) as revenue,
+    AVG(oi.unit_price) as avg_unit_price,
+    COUNT(DISTINCT o.user_id) as unique_customers
+FROM categories c
+JOIN products p ON c.category_id = p.category_id
+JOIN order_items oi ON p.product_id = oi.product_id
+JOIN orders o ON oi.order_id = o.order_id
+WHERE o.status IN ('shipped', 'delivered', 'completed')
+AND o.order_date >= NOW() - INTERVAL '90 days'
+GROUP BY c.category_id, c.name;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_dashboard_category_performance ON mv_dashboard_category_performance(category_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_dashboard_daily_trends AS
+SELECT
+    DATE(order_date) as order_date,
+    COUNT(*) as order_count,
+    SUM(total_amount) as daily_revenue,
+    AVG(total_amount) as avg_order_value,
+    COUNT(DISTINCT user_id) as unique_customers
+FROM orders
+WHERE order_date >= NOW() - INTERVAL '30 days'
+AND status NOT IN ('cancelled', 'failed')
+GROUP BY DATE(order_date);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_dashboard_daily_trends ON mv_dashboard_daily_trends(order_date);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_dashboard_top_products AS
+SELECT
+    p.product_id,
+    p.name as product_name,
+    c.name as category,
+    SUM(oi.quantity) as total_sold,
+    SUM(oi.total_price) as product_revenue,
+    COUNT(DISTINCT oi.order_id) as order_frequency
+FROM products p
+JOIN categories c ON p.category_id = c.category_id
+JOIN order_items oi ON p.product_id = oi.product_id
+JOIN orders o ON oi.order_id = o.order_id
+WHERE o.status IN ('shipped', 'delivered', 'completed')
+AND o.order_date >= NOW() - INTERVAL '30 days'
+GROUP BY p.product_id, p.name, c.name;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_dashboard_top_products ON mv_dashboard_top_products(product_id);
+CREATE INDEX IF NOT EXISTS idx_mv_dashboard_top_products_sold ON mv_dashboard_top_products(total_sold DESC);
+
+-- /optimized/category-sales-report, /optimized/top-customers: 기본 기간(30일/90일) 집계
+-- 리포트용은 REPORT_MV_REFRESH_INTERVAL(기본 10분)마다 갱신, 다른 기간(days)은 원본 테이블에서 집계
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_category_sales_30d AS
+SELECT
+    c.category_id,
+    c.name as category,
+    COUNT(DISTINCT o.order_id) as total_orders,
+    SUM(oi.quantity) as total_items_sold,
+    SUM(oi.total_price) as total_revenue,
+    COUNT(DISTINCT o.user_id) as unique_customers,
+    AVG(oi.unit_price) as avg_unit_price,
+    MIN(oi.unit_price) as min_price,
+    MAX(oi.unit_price) as max_price
+FROM categories c
+JOIN products p ON c.category_id = p.category_id
+JOIN order_items oi ON p.product_id = oi.product_id
+JOIN orders o ON oi.order_id = o.order_id
+WHERE o.order_date >= NOW() - INTERVAL '30 days'
+AND o.status IN ('shipped', 'delivered', 'completed')
+GROUP BY c.category_id, c.name;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_category_sales_30d ON mv_category_sales_30d(category_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_customer_metrics_90d AS
+SELECT
+    u.user_id,
+    u.name,
+    u.email,
+    u.created_at as join_date,
+    COUNT(DISTINCT o.order_id) as total_orders,
+    SUM(o.total_amount) as total_spent,
+    AVG(o.total_amount) as avg_order_value,
+    MAX(o.order_date) as last_order_date,
+    MIN(o.order_date) as first_order_date,
+    COUNT(DISTINCT oi.product_id) as unique_products_purchased,
+    COUNT(DISTINCT DATE_TRUNC('month', o.order_date)) as active_months,
+    SUM(oi.quantity) as total_items_purchased,
+    -- 고객 가치 점수: 총 구매액 40% + 주문 빈도 30% + 제품 다양성 20% + 활동 기간 10%
+    (
+        (SUM(o.total_amount) / 1000) * 0.4 +
+        (COUNT(DISTINCT o.order_id) * 2) * 0.3 +
+        COUNT(DISTINCT oi.product_id) * 0.2 +
+        (COUNT(DISTINCT DATE_TRUNC('month', o.order_date)) * 3) * 0.1
+    ) as customer_value_score
+FROM users u
+JOIN orders o ON u.user_id = o.user_id
+JOIN order_items oi ON o.order_id = oi.order_id
+WHERE o.order_date >= NOW() - INTERVAL '90 days'
+AND o.status IN ('shipped', 'delivered', 'completed')
+GROUP BY u.user_id, u.name, u.email, u.created_at;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_customer_metrics_90d ON mv_customer_metrics_90d(user_id);
+-- /optimized/top-customers: ORDER BY customer_value_score DESC LIMIT N 을 정렬 없이 인덱스 순서로 읽음
+CREATE INDEX IF NOT EXISTS idx_mv_customer_metrics_90d_score ON mv_customer_metrics_90d(customer_value_score DESC);
+
+-- /db-tuning/aggregation-optimization: 월별/상태별 주문 롤업
+-- 연도 단위 집계를 주문 행 대신 (월 × 상태) 행만 읽어 계산, MV_REFRESH_INTERVAL마다 갱신되므로 그 사이 주문은 반영되지 않음
+CREATE MATERIALIZED VIEW IF NOT EXISTS orders_monthly_status AS
+SELECT
+    DATE_TRUNC('month', order_date) as month,
+    status,
+    COUNT(*) as order_count,
+    SUM(total_amount) as sum_amount
+FROM orders
+GROUP BY DATE_TRUNC('month', order_date), status;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_monthly_status ON orders_monthly_status(month, status);
@@ -0,0 +1,10 @@
+-- HyperLogLog 확장 (postgresql-hll)
+-- /analytics/*?approx=true 에서 COUNT(DISTINCT) 대신 근사값 계산에 사용
+-- 기본 postgres 이미지에는 포함되어 있지 않으므로 설치되어 있을 때만 활성화
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS hll;
+EXCEPTION WHEN OTHERS THEN
+    RAISE NOTICE 'hll extension is not available: %', SQLERRM;
+END
+$$;
@@ -0,0 +1,20 @@
+-- 대시보드/구매 히스토리 WHERE 절에 맞춘 부분/커버링 인덱스
+-- 취소/실패 주문은 인덱스에서 제외해 힙 접근 없이 index-only scan 가능하게 함
+
+-- 대시보드 MV 갱신: status IN (...) AND order_date >= NOW() - INTERVAL 'N days'
+CREATE INDEX idx_orders_completed_date ON orders(order_date DESC, user_id)
+    INCLUDE (order_id, total_amount)
+    WHERE status IN ('shipped', 'delivered', 'completed');
+
+-- 상품별 집계: order_items 힙을 읽지 않고 수량/금액 합산
+CREATE INDEX idx_order_items_product_covering ON order_items(product_id)
+    INCLUDE (order_id, quantity, unit_price, total_price);
+
+-- /optimized/user-purchase-history/<user_id>
+CREATE INDEX idx_orders_user_completed_date ON orders(user_id, order_date DESC)
+    INCLUDE (order_id, status, total_amount)
+    WHERE status IN ('shipped', 'delivered', 'completed');
+
+-- index-only scan에 필요한 visibility map 갱신
+VACUUM ANALYZE orders;
+VACUUM ANALYZE order_items;
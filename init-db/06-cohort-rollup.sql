@@ -0,0 +1,77 @@
+-- 코호트 분석용 롤업 테이블
+-- /analytics/customer-cohort-analysis 가 매 요청마다 orders 전체에서 MIN(created_at)을 다시 구하지 않도록
+-- 사용자별 첫 주문과 월별 코호트 크기를 주문 INSERT 시점에 갱신
+-- 기존 볼륨에는 api-server가 시작 시 이 파일을 다시 실행해 생성하므로 여러 번 실행해도 결과가 같게 작성
+
+CREATE TABLE IF NOT EXISTS user_cohort (
+    user_id VARCHAR(20) PRIMARY KEY REFERENCES users(user_id),
+    cohort_month DATE NOT NULL,
+    first_order_date TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_cohort_month ON user_cohort(cohort_month);
+
+CREATE TABLE IF NOT EXISTS cohort_sizes_rollup (
+    cohort_month DATE PRIMARY KEY,
+    cohort_size INTEGER NOT NULL DEFAULT 0
+);
+
+-- 기존 주문으로 초기 적재 (테이블이 비어 있을 때만)
+INSERT INTO user_cohort (user_id, cohort_month, first_order_date)
+SELECT user_id, DATE_TRUNC('month', MIN(created_at))::date, MIN(created_at)
+FROM orders
+WHERE user_id IS NOT NULL AND created_at IS NOT NULL
+AND NOT EXISTS (SELECT 1 FROM user_cohort)
+GROUP BY user_id;
+
+INSERT INTO cohort_sizes_rollup (cohort_month, cohort_size)
+SELECT cohort_month, COUNT(*)
+FROM user_cohort
+WHERE NOT EXISTS (SELECT 1 FROM cohort_sizes_rollup)
+GROUP BY cohort_month;
+
+-- 트리거: 첫 주문이면 코호트 등록, 기존 첫 주문보다 이른 주문이 들어오면 코호트 이동
+CREATE OR REPLACE FUNCTION update_user_cohort()
+RETURNS TRIGGER AS $$
+DECLARE
+    new_month DATE := DATE_TRUNC('month', NEW.created_at)::date;
+    old_month DATE;
+BEGIN
+    INSERT INTO user_cohort (user_id, cohort_month, first_order_date)
+    VALUES (NEW.user_id, new_month, NEW.created_at)
+    ON CONFLICT (user_id) DO NOTHING;
+
+    IF NOT FOUND THEN
+        SELECT cohort_month INTO old_month
+        FROM user_cohort
+        WHERE user_id = NEW.user_id AND first_order_date > NEW.created_at
+        FOR UPDATE;
+
+        IF NOT FOUND THEN
+            RETURN NULL;
+        END IF;
+
+        UPDATE user_cohort
+        SET cohort_month = new_month, first_order_date = NEW.created_at
+        WHERE user_id = NEW.user_id;
+
+        IF old_month = new_month THEN
+            RETURN NULL;
+        END IF;
+
+        UPDATE cohort_sizes_rollup SET cohort_size = cohort_size - 1 WHERE cohort_month = old_month;
+    END IF;
+
+    INSERT INTO cohort_sizes_rollup (cohort_month, cohort_size)
+    VALUES (new_month, 1)
+    ON CONFLICT (cohort_month) DO UPDATE SET cohort_size = cohort_sizes_rollup.cohort_size + 1;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER update_user_cohort_on_order
+    AFTER INSERT ON orders
+    FOR EACH ROW
+    WHEN (NEW.user_id IS NOT NULL AND NEW.created_at IS NOT NULL)
+    EXECUTE FUNCTION update_user_cohort();